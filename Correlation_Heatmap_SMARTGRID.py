@@ -1,24 +1,32 @@
 import pandas as pd
 import seaborn as sns
+import matplotlib
+matplotlib.use('Agg')  # non-interactive: the figure is only written to PDF
 import matplotlib.pyplot as plt
 import numpy as np
+from weather_data import read_weather
 
 # === Load data ===
 file_path = 'csv_-29.815268_30.946439_fixed_23_0_PT5M.csv'
-df = pd.read_csv(file_path, parse_dates=['period_end'])
-
-# === Set datetime index ===
-df['period_end'] = pd.to_datetime(df['period_end'])
-df.set_index('period_end', inplace=True)
-
-# Restrict to 2024 and above
-df = df[df.index.year >= 2024]
+# Restrict to 2024 and above (only those year partitions are read)
+df = read_weather(file_path, filters=[('year', '>=', 2024)])
 
 # Extract numeric columns only
-numeric_df = df.select_dtypes(include=['float64', 'int64'])
+numeric_df = df.select_dtypes(include='number')
 
-# Compute correlation matrix
-corr_matrix = numeric_df.corr()
+# Compute Pearson correlation matrix as a single GEMM on the standardized data
+# (missing samples count as the column mean; constant columns stay NaN as in DataFrame.corr)
+# (an explicit copy: it is centred and scaled in place, and with copy-on-write the
+# frame may hand back a read-only view)
+arr = numeric_df.to_numpy(dtype=np.float64, copy=True)
+arr -= np.nanmean(arr, axis=0)
+np.nan_to_num(arr, copy=False)
+# Over all n rows, gaps included (as zeros), so the scaling matches the n in the GEMM
+std = np.sqrt(np.mean(arr ** 2, axis=0))
+with np.errstate(divide='ignore', invalid='ignore'):
+    arr /= std
+corr_matrix = pd.DataFrame(arr.T @ arr / arr.shape[0],
+                           index=numeric_df.columns, columns=numeric_df.columns)
 
 # === Plot heatmap ===
 fig, ax = plt.subplots(figsize=(12, 8), facecolor='#f9f9f9')
@@ -47,11 +55,12 @@ sns.heatmap(
         "color": "black"
     }
 )
+# Rasterize the heatmap cells so the PDF embeds one image instead of a vector path per cell
+ax.collections[0].set_rasterized(True)
 
 plt.xticks(fontsize=13.5, rotation=35, ha='right')
 plt.yticks(fontsize=13.5, rotation=0)
 plt.tight_layout()
 
 # Save with high quality
-plt.savefig("Correlation_Heatmap_SMARTGRID_Solcast.csv.pdf", format="pdf", dpi=900, bbox_inches='tight')
-plt.show()
+plt.savefig("Correlation_Heatmap_SMARTGRID_Solcast.csv.pdf", format="pdf", dpi=300, bbox_inches='tight')
@@ -4,10 +4,11 @@ fig, ax = plt.subplots(figsize=(11, 15), facecolor='#f0f0f0')
 ax.set_facecolor('#f0f0f0')
 
 # Plot AC Power from both models
+# (year-long 5-min lines are rasterized to keep the PDF small and quick to save)
 ax.plot(df.index, df["AC_Power_kW_pvlib_total"], 
-        color="orange", label="PVLIB AC Power", linewidth=2.0)
+        color="orange", label="PVLIB AC Power", linewidth=2.0, rasterized=True)
 ax.plot(df.index, df["AC_Power_kW_osm_total"], 
-        color="green", label="OSM-MEPS AC Power", linewidth=2.0)
+        color="green", label="OSM-MEPS AC Power", linewidth=2.0, rasterized=True)
 
 ax.set_xlabel("Date", fontsize=18, fontweight='bold')
 ax.set_ylabel("AC Power (kW) at 5 Minutes ", fontsize=18, fontweight='bold')
@@ -65,7 +66,7 @@ for text in legend.get_texts():
         text.set_fontsize(18)
 
 plt.tight_layout(rect=[0, 0.10, 1, 0.75])
-plt.savefig("SMARTGRID_AC_Power_kW_5min.pdf", format='pdf', bbox_inches='tight', dpi=700)
+plt.savefig("SMARTGRID_AC_Power_kW_5min.pdf", format='pdf', bbox_inches='tight', dpi=300)
 plt.show()
 
 # Print to console
@@ -0,0 +1,30 @@
+# === SMART GRID PV ANALYSIS DRIVER ===
+# Loads the 2024 weather data once and computes the PV totals once per model
+# configuration, then runs the annual summary, the Aurora comparison and the
+# ramp-rate analysis on the shared frame.
+from pv_pipeline import compute_totals, load_weather_2024
+from ANNUAL_ENERGY_PRODUCTION_graphs_and_SUMMARY import (plot_annual,
+                                                         model_params as annual_params)
+from Aurora_PVlib_OSMMEPS_PVwatts import (plot_daily_compare_with_aurora,
+                                          model_params as aurora_params)
+from RampRate_W_per_s_SMARTGrid import plot_ramp, model_params as ramp_params
+
+file_path = 'csv_-29.815268_30.946439_fixed_23_0_PT5M.csv'
+
+df = load_weather_2024(file_path)
+
+# The annual and ramp-rate scripts share one configuration; the Aurora
+# comparison uses the open-rack SAPM coefficients and its own loss terms.
+totals = {}
+
+
+def with_totals(params):
+    key = repr(sorted(params.items()))
+    if key not in totals:
+        totals[key] = compute_totals(df, **params)
+    return df.join(totals[key])
+
+
+plot_annual(with_totals(annual_params))
+plot_daily_compare_with_aurora(with_totals(aurora_params))
+plot_ramp(with_totals(ramp_params))
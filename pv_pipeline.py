@@ -0,0 +1,230 @@
+# === SHARED PV PIPELINE ===
+# Solar position, per-segment POA irradiance / cell temperature and the summed
+# AC power of the PVLIB, OSM-MEPS and PVWatts models for the rooftop segments.
+# The totals are a pure function of the weather inputs, so they are cached to
+# Parquet and reloaded on repeat runs.
+import hashlib
+import math
+import os
+
+import numpy as np
+import pandas as pd
+import pvlib
+from numba import njit, prange
+from pvlib.irradiance import aoi_projection, get_ground_diffuse, isotropic
+from pvlib.temperature import sapm_cell
+
+from weather_data import read_weather, required_columns
+
+# === PV SYSTEM PARAMETERS ===
+latitude = -29.815268
+longitude = 30.946439
+panel_power_max = 600      # W per module
+inverter_efficiency = 0.95
+temp_coeff = -0.0045
+stc_irradiance = 1000       # W/m^2
+
+# SAPM cell temperature coefficients (a, b, deltaT)
+sapm_close_mount = (-3.47, -0.0594, 3)
+sapm_open_rack = (-2.98, -0.0471, 1)
+
+# === ROOFTOP FIELD SEGMENTS ===
+field_segments = [
+    {"tilt": 5.6, "azimuth": 319.88214, "num_modules": 32},
+    {"tilt": 2.8, "azimuth": 146.61220, "num_modules": 32},
+    {"tilt": 5.0, "azimuth": 326.42346, "num_modules": 32},
+    {"tilt": 3.0, "azimuth": 315.20587, "num_modules": 32},
+    {"tilt": 3.0, "azimuth": 134.65346, "num_modules": 64},
+]
+
+cache_dir = 'cache'
+
+# Solar position per time index, shared by every compute_totals call in a session
+# (e.g. main.py runs two model configurations on the same weather frame)
+_solar_position_cache = {}
+
+
+def load_weather_2024(file_path):
+    """Load the PV model columns of the weather file for 2024 (UTC) as float32,
+    filling any missing column with zeros."""
+    # === READ YEAR 2024 ONLY (from its Parquet partition) ===
+    df = read_weather(file_path, required_columns, filters=[('year', '=', 2024)])
+
+    # === ENSURE REQUIRED METEOROLOGICAL COLUMNS EXIST ===
+    missing = [col for col in required_columns if col not in df.columns]
+    for col in missing:
+        print(f"Warning: Column '{col}' is missing. Filling with zeros.")
+    if missing:
+        df[missing] = np.float32(0)  # one multi-column insert instead of one per column
+    df[required_columns] = df[required_columns].astype(np.float32)
+    return df
+
+
+def daily_sums(df, columns):
+    """Sum ``columns`` of ``df`` per calendar day of its (local) index, with the same
+    bins as ``resample('D')``, as a DataFrame indexed by day."""
+    # One bincount per column over wall-clock day numbers. The index unit depends on
+    # the pandas version (ms after the Parquet round trip on pandas 3), so it is
+    # fixed to ns before dividing by the length of a day.
+    day_number = df.index.tz_localize(None).as_unit('ns').asi8 // (24 * 3600 * 10**9)
+    day_idx = day_number - day_number.min()
+    days = pd.date_range(df.index.min().normalize(), periods=day_idx.max() + 1, freq='D')
+    return pd.DataFrame({col: np.bincount(day_idx, weights=df[col].to_numpy(), minlength=len(days))
+                         for col in columns}, index=days)
+
+
+def _cache_key(df_weather, params):
+    # Hash of the weather inputs, the model parameters and this module's source,
+    # so editing the model invalidates old cache files. The timestamps and values
+    # are hashed as raw ndarray bytes rather than through per-row pandas hashing.
+    h = hashlib.blake2b(df_weather.index.asi8.tobytes())
+    h.update(np.ascontiguousarray(df_weather[required_columns].to_numpy(dtype=np.float32)).tobytes())
+    h.update(repr(params).encode())
+    with open(__file__, 'rb') as f:
+        h.update(f.read())
+    return h.hexdigest()
+
+
+def _solar_position(times):
+    # (apparent_zenith, azimuth) in float32 degrees, computed once per distinct index
+    key = hashlib.blake2b(times.asi8.tobytes()).hexdigest()
+    if key not in _solar_position_cache:
+        # Numba-compiled NREL SPA (numba is already required for the OSM-MEPS kernel),
+        # split across all cores rather than pvlib's default of 4 threads
+        solar_position = pvlib.solarposition.get_solarposition(times, latitude, longitude,
+                                                               method='nrel_numba',
+                                                               numthreads=os.cpu_count() or 4)
+        _solar_position_cache[key] = (solar_position["apparent_zenith"].to_numpy(dtype=np.float32),
+                                      solar_position["azimuth"].to_numpy(dtype=np.float32))
+    return _solar_position_cache[key]
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def osm_meps_total(dni, ghi, dhi, zenith, sun_azimuth, air_temp, relative_humidity, cloud_opacity,
+                   albedo, cos_tilts, sin_tilts, diffuse_factors, reflected_factors, cos_azimuths,
+                   sin_azimuths, rated_power, humidity_coeff, system_loss, out_ac):
+    # OSM-MEPS AC power (kW) summed over all segments, one fused pass per timestamp.
+    # Sun angles are in degrees; segment parameters are 1-D arrays of length n_segments
+    # holding the cos/sin of each segment's tilt and azimuth and its sky-diffuse
+    # (1 + cos tilt) / 2 and ground-reflected (1 - cos tilt) / 2 view factors, and its
+    # STC-rated DC power per unit irradiance (W per W/m^2).
+    # cos(sun_az - az) is expanded so the sun angles are evaluated once per timestamp
+    # and the segment angles once per call.
+    n = dni.shape[0]
+    nseg = cos_tilts.shape[0]
+    ac_factor = inverter_efficiency * (1 - system_loss) / 1000
+    for i in prange(n):
+        zen_rad = math.radians(zenith[i])
+        sun_az_rad = math.radians(sun_azimuth[i])
+        cos_zen = math.cos(zen_rad)
+        sin_zen = math.sin(zen_rad)
+        sin_zen_cos_az = sin_zen * math.cos(sun_az_rad)
+        sin_zen_sin_az = sin_zen * math.sin(sun_az_rad)
+        direct = dni[i] * (1 - cloud_opacity[i] / 100)
+        ghi_albedo = ghi[i] * albedo[i]
+        humidity_factor = 1 - humidity_coeff * relative_humidity[i]
+        total = 0.0
+        for k in range(nseg):
+            cos_aoi = cos_zen * cos_tilts[k] + sin_tilts[k] * (sin_zen_cos_az * cos_azimuths[k]
+                                                           + sin_zen_sin_az * sin_azimuths[k])
+            cos_aoi = max(cos_aoi, 0.0)  # a unit-vector dot product, so only the lower clamp matters
+
+            poa_total = (direct * cos_aoi
+                         + dhi[i] * diffuse_factors[k]
+                         + ghi_albedo * reflected_factors[k])
+            module_temp = 45 + poa_total / 1000 * (28 - air_temp[i])
+            total += rated_power[k] * poa_total * (1 + temp_coeff * (module_temp - 45))
+        # Humidity, inverter, loss and kW factors are common to all segments
+        out_ac[i] = total * humidity_factor * ac_factor
+
+
+def compute_totals(df_weather, sapm_params=sapm_close_mount, osm_humidity_coeff=0.002,
+                   osm_system_loss=0.01, pvwatts_system_loss=0.01):
+    """Return a DataFrame of total AC power (kW) for the PVLIB, OSM-MEPS and
+    PVWatts models, indexed like ``df_weather``."""
+    params = (sapm_params, osm_humidity_coeff, osm_system_loss, pvwatts_system_loss)
+    cache_path = os.path.join(cache_dir, f"{_cache_key(df_weather, params)}.parquet")
+    if os.path.exists(cache_path):
+        totals = pd.read_parquet(cache_path)
+        totals.index = df_weather.index
+        return totals
+
+    # Weather inputs in float32: half the memory traffic of float64, and the
+    # rounding error is far below the accuracy of the irradiance data.
+    weather = {col: df_weather[col].to_numpy(dtype=np.float32) for col in required_columns}
+
+    # Rows without any irradiance (night) give exactly zero power in every model,
+    # so the models only run on the remaining rows and are scattered back below.
+    day = np.flatnonzero((weather['ghi'] > 0) | (weather['dhi'] > 0) | (weather['dni'] > 0))
+    weather = {col: values[day] for col, values in weather.items()}
+
+    # === SOLAR POSITION ===
+    # Only the PVLIB POA uses it, so the SPA runs on the same daytime rows
+    apparent_zenith, solar_azimuth = _solar_position(df_weather.index[day])
+
+    # Segment parameters are (1, n_segments) rows and the time series are
+    # (n_time, 1) columns, so each model evaluates all segments in one broadcast pass.
+    tilt = np.array([seg["tilt"] for seg in field_segments], dtype=np.float32)[None, :]
+    azimuth = np.array([seg["azimuth"] for seg in field_segments], dtype=np.float32)[None, :]
+    num_panels = np.array([seg["num_modules"] for seg in field_segments], dtype=np.float32)[None, :]
+
+    dni = weather["dni"][:, None]
+    ghi = weather["ghi"][:, None]
+    dhi = weather["dhi"][:, None]
+    air_temp = weather["air_temp"][:, None]
+
+    # --- PVLIB MODEL ---
+    # Isotropic POA as in get_total_irradiance, but the beam term uses the AOI
+    # projection directly instead of round-tripping it through arccos and cos.
+    cos_aoi = aoi_projection(tilt, azimuth, apparent_zenith[:, None], solar_azimuth[:, None])
+    # Built up in the projection's own buffer: clamp, scale and add in place
+    poa_irradiance = np.maximum(cos_aoi, 0, out=cos_aoi)
+    poa_irradiance *= dni
+    poa_irradiance += isotropic(tilt, dhi)
+    poa_irradiance += get_ground_diffuse(tilt, ghi)
+    temp_cell = sapm_cell(poa_irradiance, air_temp, weather["wind_speed_10m"][:, None],
+                          *sapm_params)
+
+    # STC-rated DC power per unit irradiance of each segment (W per W/m^2)
+    rated_power = num_panels * (panel_power_max / stc_irradiance)
+    # poa * rated_power * (1 + temp_coeff * (temp_cell - 25)), evaluated in place in
+    # the cell-temperature buffer (not needed afterwards) instead of five temporaries
+    dc_power_pvlib = np.subtract(temp_cell, 25, out=temp_cell)
+    dc_power_pvlib *= temp_coeff
+    dc_power_pvlib += 1
+    dc_power_pvlib *= poa_irradiance
+    dc_power_pvlib *= rated_power
+
+    # --- OSM-MEPS MODEL ---
+    # Tilt/azimuth trig and view factors are per segment, so they are computed once here
+    cos_tilt = np.cos(np.radians(tilt.ravel(), dtype=np.float64))
+    sin_tilt = np.sin(np.radians(tilt.ravel(), dtype=np.float64))
+    azimuth_rad = np.radians(azimuth.ravel(), dtype=np.float64)
+    ac_power_osm = np.empty(len(day), dtype=np.float32)
+    osm_meps_total(weather['dni'], weather['ghi'], weather['dhi'], weather['zenith'], weather['azimuth'],
+                   weather['air_temp'], weather['relative_humidity'], weather['cloud_opacity'],
+                   weather['albedo'], cos_tilt, sin_tilt, (1 + cos_tilt) / 2, (1 - cos_tilt) / 2,
+                   np.cos(azimuth_rad), np.sin(azimuth_rad), rated_power.ravel(),
+                   osm_humidity_coeff, osm_system_loss, ac_power_osm)
+
+    # Sum the DC power over segments, then apply the (scalar) AC conversion and kW
+    # scaling to the 1-D totals and scatter them into preallocated full-length arrays
+    n = len(df_weather)
+    totals = {column: np.zeros(n, dtype=np.float32) for column in
+              ["AC_Power_kW_pvlib_total", "AC_Power_kW_osm_total", "AC_Power_kW_pvwatts_total"]}
+    day_dc = np.empty(len(day), dtype=np.float32)
+    np.sum(dc_power_pvlib, axis=1, out=day_dc)
+    totals["AC_Power_kW_pvlib_total"][day] = day_dc * (inverter_efficiency / 1000)
+    totals["AC_Power_kW_osm_total"][day] = ac_power_osm
+
+    # --- PVWATTS (SAM-style AC) ---
+    # pvwatts_dc(poa, temp_cell, pdc0=panel_power_max * num_panels, gamma_pdc=temp_coeff,
+    # temp_ref=25) is the same expression as the PVLIB DC power above, so it is reused
+    # and only the extra system loss differs.
+    totals["AC_Power_kW_pvwatts_total"][day] = \
+        day_dc * (inverter_efficiency * (1 - pvwatts_system_loss) / 1000)
+    totals = pd.DataFrame(totals, index=df_weather.index)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    totals.to_parquet(cache_path, compression='zstd', index=False)
+    return totals
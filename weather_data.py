@@ -0,0 +1,56 @@
+# === WEATHER DATA LOADING ===
+# Shared reader for the Solcast 5-minute weather CSV. The CSV is converted to
+# Parquet once and every later run reads the typed, columnar copy.
+import os
+import shutil
+
+import pandas as pd
+import pyarrow.dataset as ds
+
+# Meteorological columns used by the PV models
+required_columns = ['dni', 'ghi', 'dhi', 'air_temp', 'albedo', 'zenith', 'azimuth',
+                    'cloud_opacity', 'relative_humidity', 'wind_speed_10m']
+
+# Non-numeric columns of the Solcast export
+non_numeric_columns = ['period_end', 'period']
+
+
+def read_weather_csv(file_path):
+    """Read every numeric column as float32, indexed by the parsed ``period_end``,
+    with the multithreaded Arrow parser."""
+    header = pd.read_csv(file_path, nrows=0).columns
+    columns = [col for col in header if col not in non_numeric_columns]
+    # The index is set afterwards: the pyarrow engine fails when index_col is
+    # combined with dtype
+    df = pd.read_csv(file_path, engine='pyarrow', usecols=['period_end'] + columns,
+                     dtype={col: 'float32' for col in columns}, parse_dates=['period_end'])
+    return df.set_index('period_end')
+
+
+def ensure_parquet(csv_path):
+    """Write the ``<csv>.parquet`` dataset (zstd, hive-partitioned by UTC ``year``)
+    if it is missing or older than the CSV and return its path."""
+    parquet_path = csv_path + '.parquet'
+    if not os.path.isdir(parquet_path) or os.path.getmtime(parquet_path) < os.path.getmtime(csv_path):
+        df = read_weather_csv(csv_path)
+        df['year'] = df.index.year
+        # Partitioned writes add files to the directory, so replace any stale copy
+        # (including a single-file copy from before the partitioning)
+        if os.path.isfile(parquet_path):
+            os.remove(parquet_path)
+        shutil.rmtree(parquet_path, ignore_errors=True)
+        df.to_parquet(parquet_path, compression='zstd', index=True, partition_cols=['year'])
+    return parquet_path
+
+
+def read_weather(file_path, columns=None, filters=None):
+    """Load the given numeric ``columns`` (default: all of them) from the Parquet
+    copy of the weather CSV, indexed by ``period_end``. Columns the file does not
+    have are skipped so callers can fill them in. ``filters`` on the ``year``
+    partition, e.g. ``[('year', '=', 2024)]``, skip the other years' files entirely."""
+    parquet_path = ensure_parquet(file_path)
+    available = ds.dataset(parquet_path, partitioning='hive').schema.names
+    if columns is None:
+        columns = [col for col in available if col not in ('period_end', 'year')]
+    columns = [col for col in columns if col in available]
+    return pd.read_parquet(parquet_path, columns=columns, filters=filters)